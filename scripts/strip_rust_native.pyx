@@ -0,0 +1,245 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Native build of the Rust scanner used by strip_rust_source.
+
+Implements the same rules as the pure-Python _strip_rust_source, but
+walks the UTF-8 encoded source one byte at a time in C. Only ASCII bytes
+carry meaning for the scanner; every byte >= 0x80 is treated as part of
+a word, so multi-byte characters are never split.
+
+Build in place with ``python setup.py build_ext --inplace``.
+"""
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.mem cimport PyMem_Free, PyMem_Malloc
+from libc.string cimport memcpy
+
+
+cdef inline bint _is_space(unsigned char c) noexcept nogil:
+    return c == c' ' or (c >= 9 and c <= 13)
+
+
+cdef inline bint _is_word(unsigned char c) noexcept nogil:
+    return (
+        (c >= c'a' and c <= c'z')
+        or (c >= c'A' and c <= c'Z')
+        or (c >= c'0' and c <= c'9')
+        or c == c'_'
+        or c >= 128
+    )
+
+
+cdef inline bint _is_hex(unsigned char c) noexcept nogil:
+    return (
+        (c >= c'0' and c <= c'9')
+        or (c >= c'a' and c <= c'f')
+        or (c >= c'A' and c <= c'F')
+    )
+
+
+cdef inline bint _is_operator(int c) noexcept nogil:
+    # Whitespace next to these characters is never significant in Rust
+    return c >= 0 and c in b'=+-*/%<>!&|^~?:;,{}()[]'
+
+
+cdef inline bint _joins(int a, unsigned char b) noexcept nogil:
+    # ...unless dropping it would join two of them into one token or a
+    # comment opener, as _JOINING_PAIRS
+    if a < 0:
+        return False
+    if b == c'=':
+        return a in b'+-*/%^&|<>!=.'
+    if a == b:
+        return a in b':<>&|./'
+    return (a == c'<' and b == c'-') or (b == c'>' and a in b'-=') or (a == c'/' and b == c'*')
+
+
+cdef inline Py_ssize_t _utf8_len(unsigned char c) noexcept nogil:
+    if c < 0xC0:
+        return 1
+    if c < 0xE0:
+        return 2
+    if c < 0xF0:
+        return 3
+    return 4
+
+
+cdef Py_ssize_t _char_literal_end(
+    const unsigned char* buf, Py_ssize_t i, Py_ssize_t n
+) noexcept nogil:
+    """Return the index past the char literal at i, or -1 for a lifetime."""
+    cdef Py_ssize_t j = i + 1
+    cdef Py_ssize_t k
+    cdef unsigned char c
+
+    if j >= n:
+        return -1
+
+    c = buf[j]
+    if c == c'\\':
+        j += 1
+        if j >= n:
+            return -1
+        c = buf[j]
+        if (
+            c == c'x' and j + 3 < n
+            and _is_hex(buf[j + 1]) and _is_hex(buf[j + 2]) and buf[j + 3] == c"'"
+        ):
+            return j + 4
+        if c == c'u' and j + 1 < n and buf[j + 1] == c'{':
+            k = j + 2
+            while k < n and (_is_hex(buf[k]) or buf[k] == c'_'):
+                k += 1
+            if k + 1 < n and buf[k] == c'}' and buf[k + 1] == c"'":
+                return k + 2
+        if c == c'\n':
+            return -1
+    elif c == c"'" or c == c'\n':
+        return -1
+
+    j += _utf8_len(c)
+    if j < n and buf[j] == c"'":
+        return j + 1
+    return -1
+
+
+def strip_rust(const unsigned char[::1] src):
+    """Strip comments and insignificant whitespace from UTF-8 Rust source.
+
+    Accepts any contiguous bytes-like object, including a read-only mmap.
+    Returns the stripped source and the number of lines removed, counted
+    from the newlines the scan drops so no separate pass is needed.
+    """
+    cdef Py_ssize_t n = src.shape[0]
+    if n == 0:
+        return b'', 0
+
+    cdef const unsigned char* buf = &src[0]
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t o = 0
+    cdef Py_ssize_t end, j, k, hashes
+    cdef Py_ssize_t lines_removed = 0
+    cdef int depth
+    cdef int last_char = -1
+    cdef bint last_starts_digit = False
+    cdef bint pending_space = False
+    cdef bint found
+    cdef unsigned char c
+    # Every token adds at most one separating space, plus the final newline
+    cdef unsigned char* out = <unsigned char*> PyMem_Malloc(2 * n + 1)
+
+    if out == NULL:
+        raise MemoryError()
+
+    try:
+        while i < n:
+            c = buf[i]
+
+            if _is_space(c):
+                if c == c'\n':
+                    lines_removed += 1
+                i += 1
+                pending_space = True
+                continue
+
+            if c == c'/' and i + 1 < n:
+                if buf[i + 1] == c'/':
+                    while i < n and buf[i] != c'\n':
+                        i += 1
+                    pending_space = True
+                    continue
+                if buf[i + 1] == c'*':
+                    depth = 0
+                    while i < n:
+                        if buf[i] == c'/' and i + 1 < n and buf[i + 1] == c'*':
+                            depth += 1
+                            i += 2
+                        elif buf[i] == c'*' and i + 1 < n and buf[i + 1] == c'/':
+                            depth -= 1
+                            i += 2
+                            if depth == 0:
+                                break
+                        else:
+                            if buf[i] == c'\n':
+                                lines_removed += 1
+                            i += 1
+                    pending_space = True
+                    continue
+
+            if c == c'"':
+                end = i + 1
+                while end < n:
+                    if buf[end] == c'\\':
+                        end += 2
+                    elif buf[end] == c'"':
+                        end += 1
+                        break
+                    else:
+                        end += 1
+                else:
+                    end = n
+            elif c == c"'":
+                end = _char_literal_end(buf, i, n)
+                if end < 0:
+                    end = i + 1
+            elif _is_word(c):
+                end = i + 1
+                while end < n and _is_word(buf[end]):
+                    end += 1
+                if (end - i == 1 and c == c'r') or (
+                    end - i == 2 and (c == c'b' or c == c'c') and buf[i + 1] == c'r'
+                ):
+                    j = end
+                    while j < n and buf[j] == c'#':
+                        j += 1
+                    if j < n and buf[j] == c'"':
+                        hashes = j - end
+                        found = False
+                        k = j + 1
+                        while k + hashes < n:
+                            if buf[k] == c'"':
+                                found = True
+                                for j in range(k + 1, k + 1 + hashes):
+                                    if buf[j] != c'#':
+                                        found = False
+                                        break
+                                if found:
+                                    break
+                            k += 1
+                        end = k + 1 + hashes if found else n
+            else:
+                end = i + 1
+
+            if pending_space:
+                if o > 0 and not _is_operator(last_char) and not _is_operator(c):
+                    out[o] = c' '
+                    o += 1
+                elif _joins(last_char, c):
+                    out[o] = c' '
+                    o += 1
+                pending_space = False
+
+            if (
+                (c == c'+' or c == c'-')
+                and last_char >= 0
+                and (_is_word(last_char) or last_char in b')]}')
+                and not (end < n and buf[end] == c'>')
+                and not (last_starts_digit and (last_char == c'e' or last_char == c'E'))
+            ):
+                out[o] = c' '
+                o += 1
+
+            memcpy(out + o, buf + i, end - i)
+            o += end - i
+            last_char = buf[end - 1]
+            last_starts_digit = c >= c'0' and c <= c'9'
+            i = end
+
+        if o > 0 and out[o - 1] != c'\n':
+            out[o] = c'\n'
+            o += 1
+            lines_removed -= 1
+
+        return PyBytes_FromStringAndSize(<char*> out, o), lines_removed
+
+    finally:
+        PyMem_Free(out)
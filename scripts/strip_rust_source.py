@@ -8,13 +8,140 @@ Optimized for AI consumption where formatting is irrelevant.
 
 from __future__ import annotations
 
+import hashlib
+import json
+import mmap
+import os
 import re
 import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Set, Union
-
-from pydantic import BaseModel, Field, validator
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+# Optional Cython build of the Rust scanner, see strip_rust_native.pyx. The
+# extension has no stubs, so its signature is declared here.
+try:
+    import scripts.strip_rust_native as _native
+except ImportError:
+    try:
+        import strip_rust_native as _native
+    except ImportError:
+        _native = None
+
+_native_strip_rust: Optional[Callable[[Union[bytes, mmap.mmap]], Tuple[bytes, int]]] = (
+    None if _native is None else _native.strip_rust
+)
+
+# Files in flight per pipeline stage, and threads for the I/O stages
+_PIPELINE_DEPTH = 64
+_IO_WORKERS = 8
+# Below this many files, worker process startup costs more than it saves
+_MIN_FILES_FOR_PROCESSES = 32
+
+# Keeps Windows from translating newlines on raw descriptor writes
+_O_BINARY = getattr(os, 'O_BINARY', 0)
+
+# Previous-run (mtime_ns, size, content digest) stamps, kept next to the
+# output directory as .<output name><suffix> so the manifest never ships
+# with the stripped tree. The digest catches files whose mtime changed but
+# whose content did not, as after a fresh checkout.
+_MANIFEST_SUFFIX = '.strip-manifest.json'
+# Bump whenever stripping output changes so stale manifests are ignored
+_MANIFEST_VERSION = 3
+_DIGEST_SIZE = 16
+
+# Files above this size are mapped by the strip worker instead of being
+# read by the reader stage and pickled across to it
+_MMAP_THRESHOLD = 1 << 20
+
+# Read-ahead hints for those large files, which are only ever read front
+# to back. None where the platform has no such advice.
+_FADV_SEQUENTIAL = getattr(os, 'POSIX_FADV_SEQUENTIAL', None)
+_MADV_SEQUENTIAL = getattr(mmap, 'MADV_SEQUENTIAL', None)
+
+# Source buffers the scanners accept: file bytes, or a mapped large file
+_Buffer = Union[bytes, mmap.mmap]
+
+_Stamp = Tuple[int, int, str]
+
+_K = TypeVar('_K')
+_T = TypeVar('_T')
+
+# Whitespace normalization for generic (non-Rust) files, in one pass:
+# - trailing whitespace, before '\n' or '\r\n': dropped
+# - a run of blank lines: one newline (group 1)
+# - multiple spaces: one space (group 2)
+# Linear: runs only start a match at their first byte and never backtrack.
+_PAT_GENERIC_WHITESPACE = re.compile(
+    rb'(?=[ \t\n])(?:(?<![ \t])[ \t]++(?=\r?$)|\n\s*(\n)\n*|( ) +)', re.MULTILINE
+)
+_GENERIC_WHITESPACE_REPL = rb'\1\2'
+# Every match contains one of these: whitespace (or another newline)
+# right before a newline, or two spaces. Whitespace at the very end is
+# left to strip(). Most common first, as dirty files stop at the first hit.
+_GENERIC_WHITESPACE_MARKERS = (b'\n\n', b' \n', b'  ', b'\t\n', b'\r\n', b'\x0b\n', b'\x0c\n')
+
+# Trailing whitespace alone, for formats whose interior spacing and blank
+# lines can be significant (TOML strings, plain text).
+# Linear: the same run-start, possessive match as the generic pattern.
+_PAT_TRAILING_WHITESPACE = re.compile(rb'(?<![ \t])[ \t]++(?=\r?$)', re.MULTILINE)
+_TRAILING_WHITESPACE_MARKERS = (b' \n', b'\t\n', b' \r\n', b'\t\r\n')
+
+# Token patterns for the Rust scanner, all matched at the current position.
+# The scanner works on raw UTF-8 bytes: only ASCII carries meaning, every
+# byte >= 0x80 counts as a word byte, and a multi-byte character is sized
+# from its lead byte, exactly as strip_rust_native does.
+_UTF8_MULTIBYTE = rb'[\xc0-\xdf][\x00-\xff]|[\xe0-\xef][\x00-\xff]{2}|[\xf0-\xff][\x00-\xff]{3}'
+# Linear: single character class run.
+_PAT_WHITESPACE_RUN = re.compile(rb'\s+')
+# Linear: unrolled loop with possessive runs, so an unterminated string
+# fails in one sweep instead of backtracking through every character.
+_PAT_REGULAR_STRING = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+# Constant: at most an escape plus one character between the quotes.
+_PAT_CHAR = re.compile(
+    rb"'(?:[^'\\\n\xc0-\xff]|" + _UTF8_MULTIBYTE
+    + rb"|\\(?:x[0-9a-fA-F]{2}|u\{[0-9a-fA-F_]*\}|[^\n\xc0-\xff]|" + _UTF8_MULTIBYTE + rb"))'"
+)
+# Linear: one negated character class. Within a run of these bytes the
+# scanner never inserts or drops anything, so a whole run is copied as
+# one token; the excluded bytes open comments, literals, raw strings or
+# need the +/- spacing rule.
+_PAT_CODE_RUN = re.compile(rb'[^\s/"\'+\-#]+')
+# Linear: a run of '#' followed by one fixed character.
+_PAT_RAW_STRING_OPEN = re.compile(rb'(#*)"')
+
+# Single-byte sets; indexing bytes with a slice keeps comparisons bytes-to-bytes
+_WORD_BYTES = frozenset(
+    bytes([c]) for c in range(256) if c >= 0x80 or bytes([c]).isalnum() or c == ord('_')
+)
+# Whitespace next to these characters is never significant in Rust
+_OPERATORS = frozenset(bytes([c]) for c in b'=+-*/%<>!&|^~?:;,{}()[]')
+# ...unless dropping it would join two of them into one token or a comment opener
+_JOINING_PAIRS = frozenset(
+    {b'::', b'<<', b'>>', b'<-', b'->', b'=>', b'&&', b'||', b'..', b'//', b'/*'}
+    | {bytes([c]) + b'=' for c in b'+-*/%^&|<>!=.'}
+)
+_CLOSING_BRACKETS = frozenset(bytes([c]) for c in b')]}')
+_RAW_STRING_PREFIXES = frozenset({b'r', b'br', b'cr'})
+# Bytes that end a plain code run, and the word bytes for bytes.rstrip
+_RUN_BREAKS = frozenset(bytes([c]) for c in b'/"\'+-#')
+_WORD_CHARS = b''.join(sorted(_WORD_BYTES))
 
 
 class RustStripperError(Exception):
@@ -27,32 +154,34 @@ class FileProcessingError(RustStripperError):
     pass
 
 
-class StripperConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class StripperConfig:
     """Configuration for the aggressive Rust source code stripper."""
 
-    source_dir: Path = Field(default=Path("."))
-    output_dir: Path = Field(default=Path("ai_optimized_project"))
-    preserve_cargo_toml: bool = Field(default=True)
-    preserve_readme: bool = Field(default=False)
-    file_extensions: Set[str] = Field(
-        default_factory=lambda: {".rs", ".toml", ".md", ".txt"}
-    )
-    exclude_patterns: Set[str] = Field(
-        default_factory=lambda: {"target/*", "*.lock", ".git/*", "ai_optimized_project/*"}
+    source_dir: Path = Path(".")
+    output_dir: Path = Path("ai_optimized_project")
+    preserve_cargo_toml: bool = True
+    preserve_readme: bool = False
+    verbose: bool = False
+    # Strip worker processes; None uses every CPU, 1 strips in-process
+    workers: Optional[int] = None
+    file_extensions: FrozenSet[str] = frozenset({".rs", ".toml", ".md", ".txt"})
+    exclude_patterns: FrozenSet[str] = frozenset(
+        {"target/*", "*.lock", ".git/*", "ai_optimized_project/*"}
     )
 
-    @validator("source_dir", "output_dir", pre=True)
-    def validate_paths(cls, v: Union[str, Path]) -> Path:
-        """Validate and convert path inputs to Path objects."""
-        if isinstance(v, str):
-            v = Path(v)
-        return v.resolve()
+    def __post_init__(self) -> None:
+        """Validate the worker count, resolve directory paths and freeze the pattern collections."""
+        if self.workers is not None and self.workers < 1:
+            raise ValueError(f"workers must be at least 1, got {self.workers}")
 
-    class Config:
-        arbitrary_types_allowed = True
+        object.__setattr__(self, "source_dir", Path(self.source_dir).resolve())
+        object.__setattr__(self, "output_dir", Path(self.output_dir).resolve())
+        object.__setattr__(self, "file_extensions", frozenset(self.file_extensions))
+        object.__setattr__(self, "exclude_patterns", frozenset(self.exclude_patterns))
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingStats:
     """Statistics for file processing operations."""
 
@@ -76,31 +205,38 @@ class AggressiveRustStripper:
         """Initialize the aggressive Rust source stripper."""
         self.config = config
         self.stats = ProcessingStats()
-
-        # Aggressive patterns for maximum compression
-        self._all_comments_pattern = re.compile(r'//.*?$|/\*.*?\*/', re.MULTILINE | re.DOTALL)
-        self._multiple_spaces_pattern = re.compile(r' {2,}')
-        self._spaces_around_operators_pattern = re.compile(r'\s*([=+\-*/%<>!&|^~?:;,{}()\[\]])\s*')
-        self._trailing_whitespace_pattern = re.compile(r'[ \t]+$', re.MULTILINE)
-        self._blank_lines_pattern = re.compile(r'\n\s*\n+')
-        self._leading_whitespace_pattern = re.compile(r'^\s+', re.MULTILINE)
-        
-        # Patterns for collapsing multi-line constructs
-        self._multiline_fn_pattern = re.compile(r'fn\s+(\w+)\s*\([^)]*\)\s*->\s*[^{]*\{', re.MULTILINE | re.DOTALL)
-        self._multiline_struct_pattern = re.compile(r'struct\s+(\w+)\s*[^{]*\{[^}]*\}', re.MULTILINE | re.DOTALL)
-        self._multiline_impl_pattern = re.compile(r'impl\s*[^{]*\{', re.MULTILINE | re.DOTALL)
-        
-        # String literal protection patterns
-        self._string_literals = []
-        self._raw_string_pattern = re.compile(r'r#*".*?"#*', re.DOTALL)
-        self._regular_string_pattern = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
-        self._char_pattern = re.compile(r"'(?:[^'\\]|\\.)'")
+        (
+            self._excluded_dirs,
+            self._excluded_prefixes,
+            self._excluded_suffixes,
+            file_patterns,
+        ) = self._split_exclude_patterns()
+        # The output directory is pruned by its full path, wherever it sits
+        # below the source directory
+        self._excluded_paths = frozenset({str(config.output_dir)})
+        self._exclude_re = self._compile_exclude_patterns(file_patterns)
+        self._blocked_names: FrozenSet[str] = frozenset(
+            () if config.preserve_cargo_toml else ("Cargo.toml",)
+        )
+        self._readme_re = None if config.preserve_readme else re.compile("readme", re.IGNORECASE)
+        # Relative paths are sliced off the walker's path strings instead of
+        # going through Path.relative_to for every file
+        self._src_len = len(os.path.join(str(config.source_dir), ''))
+        self._out_prefix = os.path.join(str(config.output_dir), '')
+        self._manifest_path = config.output_dir.with_name(
+            f".{config.output_dir.name}{_MANIFEST_SUFFIX}"
+        )
+        self._manifest: Dict[str, _Stamp] = {}
+        self._next_manifest: Dict[str, _Stamp] = {}
+        # Stamps of files in the pipeline; the digest is filled in once read
+        self._pending_stamps: Dict[Path, Tuple[str, _Stamp]] = {}
 
     def process_project(self) -> ProcessingStats:
         """Process the entire Rust project with aggressive optimization."""
         try:
             self._create_output_directory()
             self._process_all_files()
+            self._save_manifest()
             self._log_final_stats()
             return self.stats
 
@@ -118,248 +254,367 @@ class AggressiveRustStripper:
         except OSError as e:
             raise FileProcessingError(f"Failed to create output directory: {e}") from e
 
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, _Stamp]:
+        """Load the previous run's file stamps, ignoring a missing or stale manifest."""
+        try:
+            data = json.loads(self._manifest_path.read_text(encoding='utf-8'))
+            if data.get("version") != _MANIFEST_VERSION:
+                return {}
+            return {rel: (stamp[0], stamp[1], stamp[2]) for rel, stamp in data["files"].items()}
+
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Persist stamps of every file whose output is up to date.
+
+        The manifest is only a cache, so failing to write it costs the
+        next run its skips but does not fail this one.
+        """
+        manifest_path = self._manifest_path
+        data = {"version": _MANIFEST_VERSION, "files": self._next_manifest}
+
+        try:
+            manifest_path.write_text(json.dumps(data, sort_keys=True), encoding='utf-8')
+
+        except OSError as e:
+            print(f"WARNING: Failed to write {manifest_path}: {e}")
+
+    def _skip_unchanged_files(self, files: List[Path]) -> List[Path]:
+        """Drop files whose mtime and size match the previous run's manifest.
+
+        Files that fail this check may still be skipped by _strip_jobs once
+        their content digest is known.
+        """
+        changed_files: List[Path] = []
+        relative_posix = self._relative_posix
+        output_path = self._output_path
+        previous_stamp = self._manifest.get
+        next_manifest = self._next_manifest
+        pending_stamps = self._pending_stamps
+        skipped = 0
+
+        for file_path in files:
+            relative_path = relative_posix(file_path)
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                # Let the read stage report the failure
+                changed_files.append(file_path)
+                continue
+
+            mtime_ns, size = file_stat.st_mtime_ns, file_stat.st_size
+            previous = previous_stamp(relative_path)
+
+            if (
+                previous is not None
+                and previous[0] == mtime_ns
+                and previous[1] == size
+                and os.path.isfile(output_path(file_path))
+            ):
+                next_manifest[relative_path] = previous
+                skipped += 1
+                continue
+
+            pending_stamps[file_path] = (relative_path, (mtime_ns, size, ''))
+            changed_files.append(file_path)
+
+        self.stats.files_skipped += skipped
+        return changed_files
+
     def _process_all_files(self) -> None:
-        """Process all files in the source directory."""
-        for file_path in self._get_files_to_process():
+        """Process all files through a read -> strip -> write pipeline.
+
+        Reads and writes run on thread pools while stripping runs on a
+        process pool, so disk I/O overlaps with CPU work. Each stage keeps
+        at most _PIPELINE_DEPTH files in flight to bound memory use.
+        """
+        files = self._skip_unchanged_files(self._get_files_to_process())
+        self._create_output_subdirectories(files)
+        verbose = self.config.verbose
+        bytes_removed = lines_removed_total = files_processed = 0
+
+        with (
+            ThreadPoolExecutor(max_workers=_IO_WORKERS) as readers,
+            self._strip_executor(len(files)) as strippers,
+            ThreadPoolExecutor(max_workers=_IO_WORKERS) as writers,
+        ):
+            reads = _pipelined(
+                readers,
+                AggressiveRustStripper._read_file_content,
+                ((file_path, (file_path,)) for file_path in files),
+            )
+            strips = _pipelined(strippers, _strip_content, self._strip_jobs(reads))
+            writes = _pipelined(
+                writers, AggressiveRustStripper._write_processed_file, self._write_jobs(strips)
+            )
+
+            for (file_path, original_size, processed_size, lines_removed), future in writes:
+                try:
+                    future.result()
+                except Exception as e:
+                    self._record_failure(file_path, e)
+                    continue
+
+                if file_path in self._pending_stamps:
+                    relative_path, stamp = self._pending_stamps.pop(file_path)
+                    self._next_manifest[relative_path] = stamp
+
+                bytes_removed += original_size - processed_size
+                lines_removed_total += lines_removed
+                files_processed += 1
+
+                if verbose and original_size > 0:
+                    reduction_percent = round((1 - processed_size / original_size) * 100, 2)
+                    print(f"Processed {file_path.name}: {original_size} -> {processed_size} bytes ({reduction_percent}% reduction)")
+
+        # Totals are kept in locals and folded into the stats once
+        self.stats.bytes_removed += bytes_removed
+        self.stats.lines_removed += lines_removed_total
+        self.stats.files_processed += files_processed
+
+    def _strip_executor(self, file_count: int) -> Executor:
+        """Return the executor for the strip stage.
+
+        Small runs, such as an incremental run with a handful of changed
+        files, and workers=1 strip in-process instead of starting a pool.
+        """
+        if self.config.workers == 1 or file_count < _MIN_FILES_FOR_PROCESSES:
+            return _InlineExecutor()
+
+        return ProcessPoolExecutor(max_workers=self.config.workers)
+
+    def _create_output_subdirectories(self, files: List[Path]) -> None:
+        """Create each output directory the files are written to, once.
+
+        Directories are created shallowest first, so the write stage never
+        has to check for or create a parent directory.
+        """
+        needed_dirs = {os.path.dirname(self._output_path(file_path)) for file_path in files}
+
+        for directory in sorted(needed_dirs, key=lambda path: path.count(os.sep)):
             try:
-                self._process_single_file(file_path)
+                os.makedirs(directory, exist_ok=True)
+
+            except OSError as e:
+                raise FileProcessingError(f"Failed to create output directory {directory}: {e}") from e
 
+    def _strip_jobs(
+        self, reads: Iterator[Tuple[Path, Future[Tuple[Union[bytes, Path], str]]]]
+    ) -> Iterator[Tuple[Path, Tuple[Union[bytes, Path], str]]]:
+        """Turn finished reads into strip jobs, recording read failures.
+
+        Files whose content digest matches the previous run's are skipped
+        here, before any stripping or writing.
+        """
+        for file_path, future in reads:
+            try:
+                content, digest = future.result()
+            except Exception as e:
+                self._record_failure(file_path, e)
+                continue
+
+            if file_path in self._pending_stamps:
+                relative_path, (mtime_ns, size, _) = self._pending_stamps[file_path]
+                stamp = (mtime_ns, size, digest)
+                previous = self._manifest.get(relative_path)
+
+                if (
+                    previous is not None
+                    and previous[2] == digest
+                    and os.path.isfile(self._output_path(file_path))
+                ):
+                    del self._pending_stamps[file_path]
+                    self._next_manifest[relative_path] = stamp
+                    self.stats.files_skipped += 1
+                    continue
+
+                self._pending_stamps[file_path] = (relative_path, stamp)
+
+            yield file_path, (content, file_path.suffix)
+
+    def _write_jobs(
+        self, strips: Iterator[Tuple[Path, Future[Tuple[bytes, int, int]]]]
+    ) -> Iterator[Tuple[Tuple[Path, int, int, int], Tuple[str, bytes]]]:
+        """Turn finished strips into write jobs, recording strip failures."""
+        for file_path, future in strips:
+            try:
+                processed_content, original_size, lines_removed = future.result()
             except Exception as e:
-                error_msg = f"Failed to process {file_path}: {e}"
-                self.stats.add_error(error_msg)
-                print(f"ERROR: {error_msg}")
+                self._record_failure(file_path, e)
+                continue
+
+            key = (file_path, original_size, len(processed_content), lines_removed)
+            yield key, (self._output_path(file_path), processed_content)
+
+    def _relative_posix(self, file_path: Path) -> str:
+        """Return the '/'-separated path of a file below source_dir."""
+        relative_path = str(file_path)[self._src_len:]
+        return relative_path if os.sep == '/' else relative_path.replace(os.sep, '/')
+
+    def _output_path(self, file_path: Path) -> str:
+        """Return the output path for a file below source_dir."""
+        return self._out_prefix + str(file_path)[self._src_len:]
+
+    def _record_failure(self, file_path: Path, error: Exception) -> None:
+        """Record a file that failed in any pipeline stage.
+
+        Failures are listed together once the run completes; they are only
+        echoed as they happen in verbose mode.
+        """
+        error_msg = f"Failed to process {file_path}: {error}"
+        self.stats.add_error(error_msg)
+        if self.config.verbose:
+            print(f"ERROR: {error_msg}")
+
+    def _split_exclude_patterns(
+        self,
+    ) -> Tuple[Set[str], Tuple[str, ...], Tuple[str, ...], List[str]]:
+        """Split exclusion patterns into directory names, path prefixes, suffixes and file globs.
+
+        Every form matches like Path.match, against the trailing segments
+        of the relative path, and wildcards never cross '/'. A pattern
+        ending in '/*' also covers everything below the directory it names.
+        """
+        excluded_dirs: Set[str] = set()
+        excluded_prefixes: List[str] = []
+        excluded_suffixes: List[str] = []
+        file_patterns: List[str] = []
+
+        for pattern in self.config.exclude_patterns:
+            prefix = pattern[:-1]
+            suffix = pattern[1:]
+            if pattern.startswith("*") and suffix and not any(c in suffix for c in "*?["):
+                excluded_suffixes.append(suffix)
+            elif not pattern.endswith("/*") or any(c in prefix for c in "*?["):
+                file_patterns.append(pattern)
+            elif prefix.count("/") == 1:
+                excluded_dirs.add(prefix[:-1])
+            else:
+                excluded_prefixes.append("/" + prefix)
+
+        return (
+            excluded_dirs,
+            tuple(sorted(excluded_prefixes)),
+            tuple(sorted(excluded_suffixes)),
+            file_patterns,
+        )
+
+    @staticmethod
+    def _compile_exclude_patterns(patterns: List[str]) -> Optional[re.Pattern[str]]:
+        """Union all file globs into one regex so each file needs a single match."""
+        if not patterns:
+            return None
+
+        alternatives = [
+            _translate_glob(p[:-1]) if p.endswith('/*') else _translate_glob(p) + r'\Z'
+            for p in sorted(patterns)
+        ]
+        return re.compile('(?:.*/)?(?:' + '|'.join(alternatives) + ')')
 
     def _get_files_to_process(self) -> List[Path]:
         """Get list of files to process based on configuration."""
         files_to_process: List[Path] = []
+        candidates = _walk(
+            str(self.config.source_dir),
+            self._excluded_dirs,
+            self._excluded_paths,
+            tuple(self.config.file_extensions),
+        )
 
-        for file_path in self.config.source_dir.rglob("*"):
-            if (
-                file_path.is_file()
-                and self._should_process_file(file_path)
-                and not self._is_excluded(file_path)
-            ):
-                files_to_process.append(file_path)
+        src_len = self._src_len
+        sep = os.sep
+        should_process = self._should_process_file
+        is_excluded = self._is_excluded
+        append = files_to_process.append
+
+        for path_str in candidates:
+            relative_path = path_str[src_len:]
+            if sep != '/':
+                relative_path = relative_path.replace(sep, '/')
+            name = path_str[path_str.rfind(sep) + 1:]
+            if should_process(name) and not is_excluded(relative_path):
+                append(Path(path_str))
 
         print(f"Found {len(files_to_process)} files to process")
         return files_to_process
 
-    def _should_process_file(self, file_path: Path) -> bool:
-        """Determine if a file should be processed."""
-        if file_path.suffix not in self.config.file_extensions:
+    def _should_process_file(self, name: str) -> bool:
+        """Determine if a file should be processed, given its base name."""
+        dot = name.rfind('.')
+        if dot <= 0 or name[dot:] not in self.config.file_extensions:
             return False
 
-        if file_path.name == "Cargo.toml" and not self.config.preserve_cargo_toml:
+        if name in self._blocked_names:
             return False
 
-        if file_path.name.upper().startswith("README") and not self.config.preserve_readme:
+        if self._readme_re is not None and self._readme_re.match(name):
             return False
 
         return True
 
-    def _is_excluded(self, file_path: Path) -> bool:
-        """Check if a file matches any exclusion patterns."""
-        relative_path = file_path.relative_to(self.config.source_dir)
+    def _is_excluded(self, relative_path: str) -> bool:
+        """Check if a '/'-separated relative path matches any exclusion patterns.
 
-        for pattern in self.config.exclude_patterns:
-            if relative_path.match(pattern):
+        Directory-name patterns are not checked here; the walker already
+        pruned them. See _split_exclude_patterns for where each form
+        matches.
+        """
+        if self._excluded_prefixes:
+            path = "/" + relative_path
+            if any(prefix in path for prefix in self._excluded_prefixes):
                 return True
 
-        return False
-
-    def _process_single_file(self, file_path: Path) -> None:
-        """Process a single file with aggressive optimization."""
-        try:
-            original_content = self._read_file_content(file_path)
-            original_size = len(original_content)
-            original_lines = original_content.count('\n')
-
-            if file_path.suffix == ".rs":
-                processed_content = self._aggressively_strip_rust_file(original_content)
-            else:
-                processed_content = self._aggressively_strip_generic_file(original_content)
+        if relative_path.endswith(self._excluded_suffixes):
+            return True
 
-            processed_size = len(processed_content)
-            processed_lines = processed_content.count('\n')
-
-            self.stats.bytes_removed += original_size - processed_size
-            self.stats.lines_removed += original_lines - processed_lines
-
-            self._write_processed_file(file_path, processed_content)
-            self.stats.files_processed += 1
+        if self._exclude_re is None:
+            return False
 
-            if original_size > 0:
-                reduction_percent = round((1 - processed_size / original_size) * 100, 2)
-                print(f"Processed {file_path.name}: {original_size} -> {processed_size} bytes ({reduction_percent}% reduction)")
+        return self._exclude_re.match(relative_path) is not None
 
-        except Exception as e:
-            raise FileProcessingError(f"Failed to process {file_path}: {e}") from e
+    @staticmethod
+    def _read_file_content(file_path: Path) -> Tuple[Union[bytes, Path], str]:
+        """Read the raw bytes of a file and their digest.
 
-    def _read_file_content(self, file_path: Path) -> str:
-        """Read content from a file with proper encoding handling."""
+        Files above _MMAP_THRESHOLD are only hashed; their path is returned
+        for the strip worker to map.
+        """
         try:
-            for encoding in ['utf-8', 'latin-1']:
-                try:
-                    return file_path.read_text(encoding=encoding)
-                except UnicodeDecodeError:
-                    continue
+            # One unbuffered open; its fstat gives the size for both the
+            # threshold check and readall's single read
+            with open(file_path, 'rb', buffering=0) as f:
+                if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                    if _FADV_SEQUENTIAL is not None:
+                        os.posix_fadvise(f.fileno(), 0, 0, _FADV_SEQUENTIAL)
+                    digest = hashlib.file_digest(f, _new_digest)
+                    return file_path, digest.hexdigest()
 
-            raise FileProcessingError(f"Unable to decode file {file_path}")
+                content = f.readall()
+
+            return content, hashlib.blake2b(content, digest_size=_DIGEST_SIZE).hexdigest()
 
         except OSError as e:
             raise FileProcessingError(f"Failed to read {file_path}: {e}") from e
 
-    def _protect_string_literals(self, content: str) -> str:
-        """Temporarily replace string literals with placeholders to protect them."""
-        self._string_literals = []
-        
-        def replace_string(match):
-            placeholder = f"__STRING_LITERAL_{len(self._string_literals)}__"
-            self._string_literals.append(match.group(0))
-            return placeholder
-        
-        # Protect raw strings first
-        content = self._raw_string_pattern.sub(replace_string, content)
-        # Then regular strings
-        content = self._regular_string_pattern.sub(replace_string, content)
-        # Then char literals
-        content = self._char_pattern.sub(replace_string, content)
-        
-        return content
-
-    def _restore_string_literals(self, content: str) -> str:
-        """Restore protected string literals."""
-        for i, literal in enumerate(self._string_literals):
-            placeholder = f"__STRING_LITERAL_{i}__"
-            content = content.replace(placeholder, literal)
-        return content
-
-    def _aggressively_strip_rust_file(self, content: str) -> str:
-        """Aggressively strip a Rust source file for AI consumption."""
-        # Protect string literals first
-        content = self._protect_string_literals(content)
-        
-        # Remove ALL comments (not just doc comments)
-        content = self._all_comments_pattern.sub('', content)
-        
-        # Remove all trailing whitespace
-        content = self._trailing_whitespace_pattern.sub('', content)
-        
-        # Remove all leading whitespace (indentation)
-        content = self._leading_whitespace_pattern.sub('', content)
-        
-        # Remove all blank lines
-        content = self._blank_lines_pattern.sub('\n', content)
-        
-        # Minimize spaces around operators and punctuation
-        # Be careful with certain operators that need spacing
-        def minimize_operator_spacing(match):
-            op = match.group(1)
-            # Some operators need a space before them in certain contexts
-            if op in ['-', '+'] and match.start() > 0:
-                prev_char = content[match.start() - 1] if match.start() > 0 else ''
-                if prev_char.isalnum() or prev_char in ')]}':
-                    return f' {op}'
-            # Most operators can be compressed
-            if op in '{}()[],;':
-                return op
-            elif op in '=+-*/%<>!&|^~?:':
-                return op
-            return op
-        
-        content = self._spaces_around_operators_pattern.sub(minimize_operator_spacing, content)
-        
-        # Collapse multiple spaces into single spaces
-        content = self._multiple_spaces_pattern.sub(' ', content)
-        
-        # Remove spaces after opening and before closing brackets/braces/parens
-        content = re.sub(r'([\[\{\(])\s+', r'\1', content)
-        content = re.sub(r'\s+([\]\}\)])', r'\1', content)
-        
-        # Collapse function signatures and other multi-line constructs
-        content = self._collapse_multiline_constructs(content)
-        
-        # Final cleanup - remove any remaining multiple newlines
-        content = re.sub(r'\n+', '\n', content)
-        
-        # Remove any remaining multiple spaces
-        content = re.sub(r' +', ' ', content)
-        
-        # Restore string literals
-        content = self._restore_string_literals(content)
-        
-        # Strip leading/trailing whitespace and ensure single trailing newline
-        content = content.strip()
-        if content and not content.endswith('\n'):
-            content += '\n'
-
-        return content
-
-    def _collapse_multiline_constructs(self, content: str) -> str:
-        """Collapse multi-line constructs into single lines where possible."""
-        lines = content.split('\n')
-        collapsed_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                i += 1
-                continue
-            
-            # Try to collapse multi-line constructs
-            if any(keyword in line for keyword in ['fn ', 'struct ', 'impl ', 'enum ', 'trait ']):
-                # Look for opening brace on same or next few lines
-                combined_line = line
-                j = i + 1
-                brace_count = line.count('{') - line.count('}')
-                
-                while j < len(lines) and j < i + 5:  # Look ahead max 5 lines
-                    next_line = lines[j].strip()
-                    if not next_line:
-                        j += 1
-                        continue
-                    
-                    combined_line += next_line
-                    brace_count += next_line.count('{') - next_line.count('}')
-                    
-                    if '{' in next_line:
-                        collapsed_lines.append(combined_line)
-                        i = j + 1
-                        break
-                    j += 1
-                else:
-                    collapsed_lines.append(line)
-                    i += 1
-            else:
-                collapsed_lines.append(line)
-                i += 1
-        
-        return '\n'.join(collapsed_lines)
-
-    def _aggressively_strip_generic_file(self, content: str) -> str:
-        """Aggressively strip a generic file."""
-        # For non-Rust files, still be aggressive but preserve basic structure
-        content = self._trailing_whitespace_pattern.sub('', content)
-        content = self._blank_lines_pattern.sub('\n', content)
-        content = self._multiple_spaces_pattern.sub(' ', content)
-        content = content.strip()
-
-        if content and not content.endswith('\n'):
-            content += '\n'
+    @staticmethod
+    def _write_processed_file(output_path: str, content: bytes) -> None:
+        """Write processed content to output file.
 
-        return content
-
-    def _write_processed_file(self, original_path: Path, content: str) -> None:
-        """Write processed content to output file."""
+        Goes straight to os.write on a raw descriptor; the directory was
+        created up front, and no buffered file object is needed for one
+        write of the whole content.
+        """
         try:
-            relative_path = original_path.relative_to(self.config.source_dir)
-            output_path = self.config.output_dir / relative_path
-
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(content, encoding='utf-8')
+            fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+            try:
+                view = memoryview(content)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
 
         except OSError as e:
             raise FileProcessingError(f"Failed to write {output_path}: {e}") from e
@@ -381,6 +636,320 @@ class AggressiveRustStripper:
             print(f"  Errors: {len(self.stats.errors)}")
 
 
+def _walk(
+    root: str,
+    excluded_dirs: Set[str],
+    excluded_paths: FrozenSet[str],
+    extensions: Tuple[str, ...],
+) -> Iterator[str]:
+    """Yield paths of files under root with a wanted extension.
+
+    Uses os.scandir so file/directory checks come from the cached d_type
+    instead of an extra stat per entry, and prunes directories before
+    descending into them: by name for excluded_dirs, by full path for
+    excluded_paths. Directories are walked from an explicit stack, so
+    deep trees cost neither recursion depth nor a chain of nested
+    generators. Directories that cannot be listed are skipped.
+    """
+    stack = [root]
+
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # Unreadable or vanished directory: skip it, as rglob did
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in excluded_dirs and entry.path not in excluded_paths:
+                        stack.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a glob into a regex whose wildcards never match '/'."""
+    parts: List[str] = []
+    i, n = 0, len(pattern)
+
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == '*':
+            if not parts or parts[-1] != '[^/]*':
+                parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = i + (pattern[i:i + 1] == '!')
+            end = pattern.find(']', end + (pattern[end:end + 1] == ']'))
+            if end < 0:
+                parts.append(r'\[')
+                continue
+            members = pattern[i:end]
+            i = end + 1
+            if members.startswith('!'):
+                parts.append('[^/' + _escape_class(members[1:]) + ']')
+            else:
+                parts.append('(?!/)[' + _escape_class(members) + ']')
+        else:
+            parts.append(re.escape(char))
+
+    return ''.join(parts)
+
+
+def _escape_class(members: str) -> str:
+    """Escape the members of a glob character class, keeping its ranges."""
+    return ''.join(c if c == '-' else re.escape(c) for c in members)
+
+
+def _new_digest() -> Any:
+    """Return a fresh hash object for content digests."""
+    return hashlib.blake2b(digest_size=_DIGEST_SIZE)
+
+
+class _InlineExecutor(Executor):
+    """Executor that runs each call immediately in the calling thread."""
+
+    def submit(self, fn: Callable[..., _T], /, *args: Any, **kwargs: Any) -> Future[_T]:
+        future: Future[_T] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+
+def _pipelined(
+    executor: Executor,
+    fn: Callable[..., _T],
+    jobs: Iterable[Tuple[_K, Tuple[Any, ...]]],
+    depth: int = _PIPELINE_DEPTH,
+) -> Iterator[Tuple[_K, Future[_T]]]:
+    """Submit ``fn(*args)`` for each ``(key, args)`` job, yielding futures in order.
+
+    At most ``depth`` jobs are pending at once. Because ``jobs`` is only
+    pulled as results are consumed, chaining pipelined stages gives
+    back-pressure all the way to the first one.
+    """
+    pending: Deque[Tuple[_K, Future[_T]]] = deque()
+
+    for key, args in jobs:
+        pending.append((key, executor.submit(fn, *args)))
+        if len(pending) >= depth:
+            yield pending.popleft()
+
+    while pending:
+        yield pending.popleft()
+
+
+def _strip_rust_source(content: _Buffer) -> Tuple[bytes, int]:
+    """Aggressively strip a Rust source file for AI consumption.
+
+    A single left-to-right scan over the source. Comments (line and
+    nested block) are dropped, string, raw string and char literals are
+    copied through verbatim, and in code every whitespace run collapses
+    to one space, or to nothing when it borders an operator or
+    punctuation character.
+
+    Returns the stripped source and the number of lines removed. Uses the
+    compiled strip_rust_native scanner when it has been built; it counts
+    dropped newlines as it scans.
+    """
+    if _native_strip_rust is not None:
+        return _native_strip_rust(content)
+
+    out = bytearray()
+    last_token = b''
+    pending_space = False
+    length = len(content)
+    i = 0
+
+    while i < length:
+        char = content[i:i + 1]
+
+        if char.isspace():
+            i = _PAT_WHITESPACE_RUN.match(content, i).end()  # type: ignore[union-attr]
+            pending_space = True
+            continue
+
+        if char == b'/' and i + 1 < length:
+            next_char = content[i + 1:i + 2]
+            if next_char == b'/':
+                end = content.find(b'\n', i)
+                i = length if end < 0 else end
+                pending_space = True
+                continue
+            if next_char == b'*':
+                i = _skip_block_comment(content, i)
+                pending_space = True
+                continue
+
+        if char == b'"':
+            match = _PAT_REGULAR_STRING.match(content, i)
+            end = match.end() if match else length
+        elif char == b"'":
+            # Anything that is not a char literal is a lifetime or label
+            match = _PAT_CHAR.match(content, i)
+            end = match.end() if match else i + 1
+        elif char in _RUN_BREAKS:
+            end = i + 1
+        else:
+            # Fast path: copy a whole run of plain code bytes at once
+            end = _PAT_CODE_RUN.match(content, i).end()  # type: ignore[union-attr]
+            if content[end:end + 1] in (b'#', b'"'):
+                word = _trailing_word(content[i:end])
+                if word in _RAW_STRING_PREFIXES:
+                    if end - len(word) > i:
+                        # Leave the prefix to start the next token
+                        end -= len(word)
+                    else:
+                        raw_open = _PAT_RAW_STRING_OPEN.match(content, end)
+                        if raw_open:
+                            terminator = b'"' + raw_open.group(1)
+                            close = content.find(terminator, raw_open.end())
+                            end = length if close < 0 else close + len(terminator)
+
+        token = content[i:end]
+        last_char = last_token[-1:]
+
+        if pending_space:
+            if out and last_char not in _OPERATORS and char not in _OPERATORS:
+                out += b' '
+            elif last_char + char in _JOINING_PAIRS:
+                out += b' '
+            pending_space = False
+
+        if (
+            char in (b'+', b'-')
+            and (last_char in _WORD_BYTES or last_char in _CLOSING_BRACKETS)
+            and content[end:end + 1] != b'>'
+            and not (last_char in (b'e', b'E') and _trailing_word(last_token)[:1].isdigit())
+        ):
+            # Keep +/- visually apart from the preceding operand, except
+            # inside a float exponent such as 1e-5
+            out += b' '
+
+        out += token
+        last_token = token
+        i = end
+
+    if out and not out.endswith(b'\n'):
+        out += b'\n'
+
+    # One C-level count beats tracking newlines token by token in Python
+    return bytes(out), _count_newlines(content) - out.count(b'\n')
+
+
+def _trailing_word(token: bytes) -> bytes:
+    """Return the word the token ends with, or b'' if it ends in punctuation."""
+    return token[len(token.rstrip(_WORD_CHARS)):]
+
+
+def _skip_block_comment(content: _Buffer, start: int) -> int:
+    """Return the index just past the (possibly nested) block comment at start."""
+    depth = 0
+    i = start
+    close_at = -1
+
+    while True:
+        # Each closer is searched for once, which keeps the scan linear
+        if close_at < i:
+            close_at = content.find(b'*/', i)
+            if close_at < 0:
+                return len(content)
+
+        # An opener overlapping the closer ("/*/") comes first, so it counts
+        open_at = content.find(b'/*', i, close_at + 1)
+        if open_at >= 0:
+            depth += 1
+            i = open_at + 2
+        else:
+            depth -= 1
+            i = close_at + 2
+            if depth == 0:
+                return i
+
+
+def _strip_generic_source(content: _Buffer) -> Tuple[bytes, int]:
+    """Aggressively strip a generic file."""
+    # For non-Rust files, still be aggressive but preserve basic structure
+    if any(content.find(marker) >= 0 for marker in _GENERIC_WHITESPACE_MARKERS):
+        processed = _PAT_GENERIC_WHITESPACE.sub(_GENERIC_WHITESPACE_REPL, content)
+    else:
+        # Already clean: a few substring searches are much cheaper than
+        # the regex scan. bytes() only copies a mapping.
+        processed = bytes(content)
+
+    return _finish_text(content, processed)
+
+
+def _strip_trailing_whitespace(content: _Buffer) -> Tuple[bytes, int]:
+    """Strip only trailing whitespace, keeping interior spacing and blank lines."""
+    if any(content.find(marker) >= 0 for marker in _TRAILING_WHITESPACE_MARKERS):
+        processed = _PAT_TRAILING_WHITESPACE.sub(b'', content)
+    else:
+        processed = bytes(content)
+
+    return _finish_text(content, processed)
+
+
+def _finish_text(content: _Buffer, processed: bytes) -> Tuple[bytes, int]:
+    """Trim processed text, end it with one newline and count lines removed."""
+    processed = processed.strip()
+
+    if processed and not processed.endswith(b'\n'):
+        processed += b'\n'
+
+    return processed, _count_newlines(content) - processed.count(b'\n')
+
+
+# Strip function per file suffix; anything else is treated as generic text.
+# Collapsing spaces or blank lines can change a TOML value (multi-line and
+# quoted strings), so TOML and plain text only lose trailing whitespace.
+_STRIP_FNS: Dict[str, Callable[[_Buffer], Tuple[bytes, int]]] = {
+    '.rs': _strip_rust_source,
+    '.toml': _strip_trailing_whitespace,
+    '.txt': _strip_trailing_whitespace,
+}
+
+
+def _strip_content(source: Union[bytes, Path], suffix: str) -> Tuple[bytes, int, int]:
+    """Strip file content in a worker process.
+
+    ``source`` is either the file content or, for large files, the path
+    to map read-only. Returns the processed content, the original size
+    and the number of lines removed.
+    """
+    if isinstance(source, Path):
+        with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            if _MADV_SEQUENTIAL is not None:
+                content.madvise(_MADV_SEQUENTIAL)
+            return _strip_buffer(content, suffix)
+
+    return _strip_buffer(source, suffix)
+
+
+def _strip_buffer(content: _Buffer, suffix: str) -> Tuple[bytes, int, int]:
+    """Strip an in-memory or mapped buffer, see _strip_content."""
+    processed_content, lines_removed = _STRIP_FNS.get(suffix, _strip_generic_source)(content)
+    return processed_content, len(content), lines_removed
+
+
+def _count_newlines(content: _Buffer) -> int:
+    """Count newlines; mmap has no count(), so a mapping is counted in slices."""
+    if isinstance(content, bytes):
+        return content.count(b'\n')
+
+    return sum(
+        content[start:start + _MMAP_THRESHOLD].count(b'\n')
+        for start in range(0, len(content), _MMAP_THRESHOLD)
+    )
+
+
 def main() -> int:
     """Main entry point for aggressive Rust source stripping."""
     try:
@@ -389,15 +958,17 @@ def main() -> int:
             output_dir=Path("processed_project"),
             preserve_cargo_toml=True,
             preserve_readme=False,
-            file_extensions={".rs", ".toml"},
-            exclude_patterns={
-                "target/*",
-                "*.lock",
-                ".git/*",
-                "processed_project/*",
-                ".github/*",
-                "docs/*"
-            }
+            file_extensions=frozenset({".rs", ".toml"}),
+            exclude_patterns=frozenset(
+                {
+                    "target/*",
+                    "*.lock",
+                    ".git/*",
+                    "processed_project/*",
+                    ".github/*",
+                    "docs/*",
+                }
+            ),
         )
 
         print("Starting aggressive Rust source code stripping for AI optimization...")
@@ -0,0 +1,24 @@
+"""Build the optional Cython scanner for scripts/strip_rust_source.py.
+
+Project metadata lives in pyproject.toml. When Cython is unavailable, or
+the extension fails to compile (e.g. no C compiler), it is skipped and
+the stripper uses its pure-Python scanner.
+"""
+
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("scripts.strip_rust_native", ["scripts/strip_rust_native.pyx"])],
+        compiler_directives={"language_level": "3"},
+    )
+    # cythonize rebuilds the Extension objects without the optional flag,
+    # so it is set here: a failed compile then only warns
+    for ext in ext_modules:
+        ext.optional = True
+
+setup(ext_modules=ext_modules)
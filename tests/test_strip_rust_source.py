@@ -0,0 +1,245 @@
+"""Tests for scripts/strip_rust_source.py."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from scripts import strip_rust_source as srs
+
+_Strip = Callable[[bytes], Tuple[bytes, int]]
+
+_NATIVE = srs._native_strip_rust
+_requires_native = pytest.mark.skipif(_NATIVE is None, reason="strip_rust_native is not built")
+
+
+@pytest.fixture(params=["python", pytest.param("native", marks=_requires_native)])
+def strip(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> _Strip:
+    """The Rust scanner, once as pure Python and once as the native build."""
+    if request.param == "python":
+        monkeypatch.setattr(srs, "_native_strip_rust", None)
+
+    return srs._strip_rust_source
+
+
+def _python_strip(source: bytes) -> Tuple[bytes, int]:
+    native, srs._native_strip_rust = srs._native_strip_rust, None
+    try:
+        return srs._strip_rust_source(source)
+    finally:
+        srs._native_strip_rust = native
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        # Raw strings are copied verbatim, whatever they contain
+        (
+            b'let s = r#"a "quoted" // not a comment"#;',
+            b'let s=r#"a "quoted" // not a comment"#;\n',
+        ),
+        (b'let b = br"x  y"; let c = cr##"z"#"##;', b'let b=br"x  y";let c=cr##"z"#"##;\n'),
+        (b'let r = r"unterminated', b'let r=r"unterminated\n'),
+        # Block comments nest
+        (b"a /* x /* y */ z */ b", b"a b\n"),
+        # Dropping this space would turn "/ *" into a comment opener
+        (b"a / /* c */ *b", b"a/ *b\n"),
+        (b"a/ /b", b"a/ /b\n"),
+        # ...as would any space that keeps two operators from lexing as one
+        (b"fn f(x: ::std::string::String)", b"fn f(x: ::std::string::String)\n"),
+        (b"a < <T as Tr>::C", b"a< <T as Tr>::C\n"),
+        (b"if x < -1 {}", b"if x< -1{}\n"),
+        (b"b & &c; d | |e| e; f ! = g", b"b& &c;d| |e|e;f! =g\n"),
+        (b"a .. b; x = = y; x > = y", b"a .. b;x= =y;x> =y\n"),
+        # A sign inside a float exponent stays attached
+        (b"let x = 1e-5 + 2E+3 - y;", b"let x=1e-5 +2E+3 -y;\n"),
+        (b"fn f() -> u8 { a - b }", b"fn f()->u8{a -b}\n"),
+        # Lifetimes and labels versus char literals
+        (b"fn f<'a>(x: &'a str) -> char { '\\'' }", b"fn f<'a>(x:&'a str)->char{'\\''}\n"),
+        (b"let c = ' '; let l = 'label: loop {}", b"let c=' ';let l='label:loop{}\n"),
+        # An unterminated string runs to the end of the file
+        (b'let s = "abc  \n def', b'let s="abc  \n def\n'),
+        (b"", b""),
+    ],
+)
+def test_strip_rust_edge_cases(strip: _Strip, source: bytes, expected: bytes) -> None:
+    assert strip(source)[0] == expected
+
+
+def test_strip_rust_counts_removed_lines(strip: _Strip) -> None:
+    source = b'let s = "a  b // c"; // comment\n\n/* one\ntwo */\nlet t = 1;\n'
+
+    assert strip(source) == (b'let s="a  b // c";let t=1;\n', 4)
+
+
+_FRAGMENTS = [
+    "fn", "x", "r", "br", "cr", "1", "1e", "E", "_", "é", "💡",
+    " ", "  ", "\t", "\n", "\r\n",
+    "/", "*", "/*", "*/", "//", '"', "\\", "'", "#", "##",
+    "+", "-", "<", ">", "=", "!", "{", "}", "(", ")", ";", ":", "&", "|", ".",
+]
+
+
+@_requires_native
+@settings(max_examples=2000, deadline=None)
+@given(
+    st.one_of(
+        st.lists(st.sampled_from(_FRAGMENTS), max_size=40).map(lambda parts: "".join(parts).encode()),
+        st.binary(max_size=64),
+    )
+)
+def test_native_scanner_matches_python(source: bytes) -> None:
+    assert _NATIVE is not None
+    assert _NATIVE(source) == _python_strip(source)
+
+
+@pytest.mark.usefixtures("strip")
+def test_large_file_is_stripped_from_a_mapping(tmp_path: Path) -> None:
+    path = tmp_path / "big.rs"
+    chunk = b"fn main() {\n    let x = 1; // one\n}\n"
+    path.write_bytes(chunk * (srs._MMAP_THRESHOLD // len(chunk) + 1))
+
+    source, _ = srs.AggressiveRustStripper._read_file_content(path)
+
+    # Above the threshold the reader hands over the path, not the content
+    assert source == path
+    assert srs._strip_content(source, ".rs") == srs._strip_buffer(path.read_bytes(), ".rs")
+
+
+@pytest.mark.parametrize(
+    ("strip_fn", "source", "expected"),
+    [
+        (srs._strip_generic_source, b"a  b \n\n\n  c\t\n", b"a b\n c\n"),
+        (srs._strip_generic_source, b"a  \r\nb", b"a\r\nb\n"),
+        (srs._strip_trailing_whitespace, b'k = "a  b"  \n\n\nx = 1\t\n', b'k = "a  b"\n\n\nx = 1\n'),
+        (srs._strip_trailing_whitespace, b"a  \r\nb", b"a\r\nb\n"),
+    ],
+)
+def test_strip_text(strip_fn: _Strip, source: bytes, expected: bytes) -> None:
+    assert strip_fn(source)[0] == expected
+
+
+def _make_tree(root: Path, files: Dict[str, str]) -> None:
+    for relative_path, content in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def _stripper(
+    source: Path, output: Path, exclude_patterns: Iterable[str] = (), workers: int = 1
+) -> srs.AggressiveRustStripper:
+    config = srs.StripperConfig(
+        source_dir=source,
+        output_dir=output,
+        workers=workers,
+        exclude_patterns=frozenset(exclude_patterns),
+    )
+    return srs.AggressiveRustStripper(config)
+
+
+def _found(stripper: srs.AggressiveRustStripper, source: Path) -> List[str]:
+    return sorted(path.relative_to(source).as_posix() for path in stripper._get_files_to_process())
+
+
+def test_exclusion_patterns(tmp_path: Path) -> None:
+    source = tmp_path / "src"
+    _make_tree(
+        source,
+        {
+            "main.rs": "",
+            "target/debug/build.rs": "",
+            "plugins/p/target/gen.rs": "",
+            "gen/sub/x.rs": "",
+            "gen/keep.rs": "",
+            "p/gen/sub/y.rs": "",
+            "lib.gen.rs": "",
+            "docs/a.rs": "",
+            "x/docs/a.rs": "",
+            "docs/d/a.rs": "",
+            "t?mp/z.rs": "",
+        },
+    )
+    stripper = _stripper(
+        source,
+        tmp_path / "out",
+        exclude_patterns={"target/*", "gen/sub/*", "*.gen.rs", "docs/*.rs", "t[?]mp/*"},
+    )
+
+    # Every form matches at any depth, and '*' never crosses '/'
+    assert _found(stripper, source) == ["docs/d/a.rs", "gen/keep.rs", "main.rs"]
+
+
+def test_nested_output_dir_is_pruned_by_path(tmp_path: Path) -> None:
+    _make_tree(tmp_path, {"src/main.rs": "", "src/a/x.rs": "", "src/gen/old.rs": ""})
+    stripper = _stripper(tmp_path, tmp_path / "src" / "gen", exclude_patterns=())
+
+    assert _found(stripper, tmp_path) == ["src/a/x.rs", "src/main.rs"]
+
+
+def test_manifest_skips_unchanged_files(tmp_path: Path) -> None:
+    source, output = tmp_path / "src", tmp_path / "out"
+    _make_tree(source, {"a.rs": "fn a() {}\n", "b.rs": "fn b() {}\n"})
+
+    first = _stripper(source, output).process_project()
+    assert (first.files_processed, first.files_skipped) == (2, 0)
+    # The manifest lives beside the output, never inside it
+    assert sorted(os.listdir(output)) == ["a.rs", "b.rs"]
+    assert (tmp_path / ".out.strip-manifest.json").is_file()
+
+    second = _stripper(source, output).process_project()
+    assert (second.files_processed, second.files_skipped) == (0, 2)
+
+    # New mtime, same content: skipped on the digest
+    stat = os.stat(source / "a.rs")
+    os.utime(source / "a.rs", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (source / "b.rs").write_text("fn b() { 1 }\n", encoding="utf-8")
+
+    third = _stripper(source, output).process_project()
+    assert (third.files_processed, third.files_skipped) == (1, 1)
+    assert (output / "b.rs").read_bytes() == b"fn b(){1}\n"
+
+    # A deleted output is regenerated even though its stamp matches
+    (output / "a.rs").unlink()
+    fourth = _stripper(source, output).process_project()
+    assert (fourth.files_processed, fourth.files_skipped) == (1, 1)
+
+
+def test_unwritable_manifest_only_warns(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    source, output = tmp_path / "src", tmp_path / "out"
+    _make_tree(source, {"a.rs": "fn a() {}\n"})
+    # A directory in the manifest's place makes writing it fail
+    (tmp_path / ".out.strip-manifest.json").mkdir()
+
+    stats = _stripper(source, output).process_project()
+
+    assert (stats.files_processed, stats.files_failed) == (1, 0)
+    assert "WARNING: Failed to write" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_config_rejects_fewer_than_one_worker(workers: int) -> None:
+    with pytest.raises(ValueError, match="workers"):
+        srs.StripperConfig(workers=workers)
+
+
+def test_process_pool_matches_inline(tmp_path: Path) -> None:
+    source = tmp_path / "src"
+    files = {
+        f"m{i}.rs": f"fn f{i}() {{\n    let x = {i}; // c\n}}\n"
+        for i in range(srs._MIN_FILES_FOR_PROCESSES)
+    }
+    _make_tree(source, files)
+
+    pooled = _stripper(source, tmp_path / "pooled", workers=2).process_project()
+    inline = _stripper(source, tmp_path / "inline").process_project()
+
+    assert (pooled.files_processed, pooled.files_failed) == (len(files), 0)
+    assert (pooled.bytes_removed, pooled.lines_removed) == (inline.bytes_removed, inline.lines_removed)
+    for name in files:
+        assert (tmp_path / "pooled" / name).read_bytes() == (tmp_path / "inline" / name).read_bytes()